@@ -2,14 +2,142 @@
 """
 MCP服务器API Schema获取脚本
 需要安装：pip install mcp
+可选安装：pip install orjson（仅加速--utf8模式下的schema文件写入）
 """
 
 import asyncio
 import json
 import sys
-from typing import Dict, Any, Optional
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from contextlib import AsyncExitStack
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from mcp import ClientSession
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 批量获取schema时同时启动的MCP服务器进程数上限
+MAX_CONCURRENT_SESSIONS = 8
+
+class MCPSchemaClient:
+    """
+    持久化的MCP服务器连接，可在多次获取schema时复用同一个会话
+
+    Args:
+        server_command: 启动MCP服务器的命令
+        args: 服务器命令行参数
+    """
+
+    def __init__(self, server_command: str, args: list = None):
+        self.server_command = server_command
+        self.args = args if args is not None else []
+        self.session: Optional["ClientSession"] = None
+        self._exit_stack: Optional[AsyncExitStack] = None
+
+    async def connect(self):
+        """启动MCP服务器并初始化会话，已连接时直接返回"""
+        if self.session is not None:
+            return
+
+        # 仅在真正连接服务器时导入mcp，避免只读用法承担其导入开销
+        from mcp import ClientSession, StdioServerParameters
+        from mcp.client.stdio import stdio_client
+
+        # 创建服务器参数
+        server_params = StdioServerParameters(
+            command=self.server_command,
+            args=self.args
+        )
+
+        exit_stack = AsyncExitStack()
+        try:
+            # 创建stdio客户端连接
+            read_stream, write_stream = await exit_stack.enter_async_context(stdio_client(server_params))
+
+            # 创建客户端会话并初始化
+            session = await exit_stack.enter_async_context(ClientSession(read_stream, write_stream))
+            await session.initialize()
+        except BaseException:
+            # 将异常传递给已进入的上下文，确保服务器进程被终止
+            await exit_stack.__aexit__(*sys.exc_info())
+            raise
+
+        self._exit_stack = exit_stack
+        self.session = session
+
+    async def fetch(self) -> Dict[str, Any]:
+        """
+        获取所有API的Input Schema，可在同一会话上重复调用
+
+        Returns:
+            包含所有工具schema的字典
+        """
+        if self.session is None:
+            await self.connect()
+
+        # 列出所有可用工具
+        tools = (await self.session.list_tools()).tools
+        separator = "-" * 50
+
+        schemas = {}
+        # 标明报告所属的服务器，便于区分批量并发获取时的输出
+        server = " ".join([self.server_command, *self.args])
+        lines = [f"服务器: {server}", f"发现 {len(tools)} 个工具:", separator]
+
+        # 获取每个工具的详细信息
+        for tool in tools:
+            name = tool.name
+            description = tool.description
+            input_schema = getattr(tool, 'inputSchema', None)
+            lines.append(f"工具名称: {name}")
+            lines.append(f"描述: {description}")
+
+            if input_schema:
+                schemas[name] = {
+                    "description": description,
+                    "inputSchema": input_schema,
+                    "parameters": getattr(tool, 'parameters', {})
+                }
+            else:
+                lines.append("无Input Schema定义")
+                schemas[name] = {
+                    "description": description,
+                    "inputSchema": None
+                }
+
+            lines.append(separator)
+
+        # 所有工具收集完毕后统一输出一次，避免逐个工具重复序列化；终端输出保留中文原文便于阅读
+        if schemas:
+            lines.append("Input Schema:")
+            lines.append(json.dumps(schemas, indent=2, ensure_ascii=False))
+
+        sys.stdout.write("\n".join(lines) + "\n")
+
+        return schemas
+
+    async def close(self):
+        """关闭会话并终止MCP服务器进程"""
+        await self._close(None, None, None)
+
+    async def _close(self, exc_type, exc_value, traceback) -> bool:
+        """按进入的相反顺序退出会话和stdio上下文，并将异常信息传递给它们"""
+        exit_stack, self._exit_stack = self._exit_stack, None
+        self.session = None
+        if exit_stack is None:
+            return False
+        return await exit_stack.__aexit__(exc_type, exc_value, traceback)
+
+    async def __aenter__(self) -> "MCPSchemaClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> bool:
+        return await self._close(exc_type, exc_value, traceback)
+
 
 async def get_server_schemas(server_command: str, args: list = None) -> Dict[str, Any]:
     """
@@ -22,63 +150,82 @@ async def get_server_schemas(server_command: str, args: list = None) -> Dict[str
     Returns:
         包含所有工具schema的字典
     """
-    if args is None:
-        args = []
-    
-    schemas = {}
-    
     try:
-        # 创建服务器参数
-        server_params = StdioServerParameters(
-            command=server_command,
-            args=args
-        )
-        
-        # 创建stdio客户端连接
-        async with stdio_client(server_params) as (read_stream, write_stream):
-            # 创建客户端会话
-            async with ClientSession(read_stream, write_stream) as session:
-                # 初始化会话
-                await session.initialize()
-                
-                # 列出所有可用工具
-                tools_response = await session.list_tools()
-                
-                print(f"发现 {len(tools_response.tools)} 个工具:")
-                print("-" * 50)
-                
-                # 获取每个工具的详细信息
-                for tool in tools_response.tools:
-                    print(f"工具名称: {tool.name}")
-                    print(f"描述: {tool.description}")
-                    
-                    if hasattr(tool, 'inputSchema') and tool.inputSchema:
-                        print("Input Schema:")
-                        print(json.dumps(tool.inputSchema, indent=2, ensure_ascii=False))
-                        schemas[tool.name] = {
-                            "description": tool.description,
-                            "inputSchema": tool.inputSchema,
-                            "parameters": getattr(tool, 'parameters', {})
-                        }
-                    else:
-                        print("无Input Schema定义")
-                        schemas[tool.name] = {
-                            "description": tool.description,
-                            "inputSchema": None
-                        }
-                    
-                    print("-" * 50)
-                
-                return schemas
-                
+        async with MCPSchemaClient(server_command, args) as client:
+            return await client.fetch()
+
+    except ImportError:
+        # 未安装mcp属于环境问题，不作为连接错误吞掉
+        raise
     except Exception as e:
         print(f"连接服务器时出错: {e}", file=sys.stderr)
         return {}
 
-def save_schemas_to_file(schemas: Dict[str, Any], filename: str = "mcp_schemas.json"):
-    """将schema保存到JSON文件"""
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(schemas, f, indent=2, ensure_ascii=False)
+async def get_server_schemas_batch(servers: List[Tuple[str, List[str]]],
+                                   max_concurrency: int = MAX_CONCURRENT_SESSIONS
+                                   ) -> Dict[Tuple[str, Tuple[str, ...]], Dict[str, Any]]:
+    """
+    并发获取多个MCP服务器的schema，相同的(命令, 参数)只建立一次会话
+
+    Args:
+        servers: (启动命令, 命令行参数)列表
+        max_concurrency: 同时运行的MCP服务器进程数上限
+
+    Returns:
+        以(命令, 参数元组)为键、对应schema字典为值的字典
+    """
+    keys = list(dict.fromkeys((command, tuple(args or ())) for command, args in servers))
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def collect(command: str, args: Tuple[str, ...]) -> Dict[str, Any]:
+        async with semaphore:
+            return await get_server_schemas(command, list(args))
+
+    results = await asyncio.gather(*(collect(command, args) for command, args in keys),
+                                   return_exceptions=True)
+
+    # get_server_schemas已将连接错误转换为空字典，能到达这里的异常只有缺少mcp时的ImportError
+    # 和任务取消的CancelledError，二者都应继续向上抛出
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return dict(zip(keys, results))
+
+def save_schemas_to_file(schemas: Dict[str, Any], filename: str = "mcp_schemas.json", pretty: bool = False,
+                         ensure_ascii: bool = True):
+    """
+    将schema保存到JSON文件，仅在ensure_ascii为False（--utf8）且已安装orjson时使用orjson编码
+
+    默认使用标准库json并将非ASCII字符转义写入；ensure_ascii为False时以UTF-8原文写入。
+    orjson与标准库的输出并不完全相同（如1e16不写作1e+16、NaN写作null），
+    orjson无法编码的内容（如超过64位的整数）回退到标准库json
+
+    Args:
+        schemas: 工具schema字典
+        filename: 输出文件名
+        pretty: 是否缩进输出，默认写入紧凑格式
+        ensure_ascii: 是否转义非ASCII字符
+    """
+    content = None
+    if orjson is not None and not ensure_ascii:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        try:
+            content = orjson.dumps(schemas, option=option)
+        except orjson.JSONEncodeError:
+            content = None
+
+    if content is None:
+        if pretty:
+            text = json.dumps(schemas, indent=2, ensure_ascii=ensure_ascii)
+        else:
+            text = json.dumps(schemas, ensure_ascii=ensure_ascii, separators=(',', ':'))
+        content = text.encode('utf-8')
+
+    # 先整体编码再一次性写入，避免json.dump逐块写文件
+    with open(filename, 'wb') as f:
+        f.write(content)
     print(f"\nSchema已保存到 {filename}")
 
 async def main():
@@ -92,21 +239,29 @@ async def main():
                        help='MCP服务器参数')
     parser.add_argument('--output', '-o', default='mcp_schemas.json',
                        help='输出文件名（默认：mcp_schemas.json）')
+    parser.add_argument('--pretty', action='store_true',
+                       help='以缩进格式写入输出文件（默认写入紧凑格式）')
+    parser.add_argument('--utf8', action='store_true',
+                       help='以UTF-8原文写入非ASCII字符（默认转义为\\uXXXX，终端输出不受影响）')
     
     args = parser.parse_args()
     
     print("正在连接到MCP服务器...")
+    # 输出重定向到管道时也让提示先于可能的错误信息显示
+    sys.stdout.flush()
     schemas = await get_server_schemas(args.command, args.args)
     
     if schemas:
-        save_schemas_to_file(schemas, args.output)
+        save_schemas_to_file(schemas, args.output, args.pretty, not args.utf8)
         
-        # 生成简要报告
-        print("\n=== Schema统计 ===")
-        print(f"总工具数: {len(schemas)}")
+        # 生成简要报告，一次性写出
         with_schema = sum(1 for s in schemas.values() if s['inputSchema'])
-        print(f"包含Schema的工具: {with_schema}")
-        print(f"无Schema的工具: {len(schemas) - with_schema}")
+        sys.stdout.write("\n".join([
+            "\n=== Schema统计 ===",
+            f"总工具数: {len(schemas)}",
+            f"包含Schema的工具: {with_schema}",
+            f"无Schema的工具: {len(schemas) - with_schema}",
+        ]) + "\n")
     else:
         print("未获取到任何schema信息")
 
@@ -0,0 +1,4 @@
+import os
+import sys
+test_path = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append("{}/..".format(test_path))
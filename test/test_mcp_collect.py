@@ -0,0 +1,201 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest.mock import patch
+
+test_path = os.path.split(os.path.realpath(__file__))[0]
+sys.path.append("{}/..".format(test_path))
+
+import mcp_collect  # noqa: E402
+
+
+class StubSession:
+    """模拟ClientSession，记录退出时收到的异常"""
+
+    tools = []
+    fail_initialize = False
+    open_sessions = 0
+    peak_sessions = 0
+
+    def __init__(self, read_stream, write_stream):
+        self.exit_args = None
+        StubMCP.sessions.append(self)
+
+    async def __aenter__(self):
+        StubSession.open_sessions += 1
+        StubSession.peak_sessions = max(StubSession.peak_sessions, StubSession.open_sessions)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        StubSession.open_sessions -= 1
+        self.exit_args = (exc_type, exc_value)
+        return False
+
+    async def initialize(self):
+        # 让出事件循环，使并发的会话有机会同时处于打开状态
+        await asyncio.sleep(0.01)
+        if self.fail_initialize:
+            raise RuntimeError("initialize failed")
+
+    async def list_tools(self):
+        return types.SimpleNamespace(tools=self.tools)
+
+
+class StubMCP:
+    """构造mcp及mcp.client.stdio的替身模块"""
+
+    sessions = []
+    spawned = []
+    stdio_exit_args = []
+
+    @classmethod
+    def modules(cls):
+        cls.sessions = []
+        cls.spawned = []
+        cls.stdio_exit_args = []
+
+        class StdioServerParameters:
+            def __init__(self, command, args):
+                self.command = command
+                self.args = args
+
+        @contextlib.asynccontextmanager
+        async def stdio_client(server_params):
+            cls.spawned.append((server_params.command, tuple(server_params.args)))
+            try:
+                yield ("read", "write")
+            except BaseException as e:
+                cls.stdio_exit_args.append(type(e))
+                raise
+            else:
+                cls.stdio_exit_args.append(None)
+
+        mcp = types.ModuleType("mcp")
+        mcp.ClientSession = StubSession
+        mcp.StdioServerParameters = StdioServerParameters
+        client = types.ModuleType("mcp.client")
+        stdio = types.ModuleType("mcp.client.stdio")
+        stdio.stdio_client = stdio_client
+        return {"mcp": mcp, "mcp.client": client, "mcp.client.stdio": stdio}
+
+
+def make_tool(name, input_schema):
+    return types.SimpleNamespace(name=name, description=f"{name} 描述", inputSchema=input_schema)
+
+
+class TestMCPSchemaClient(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        patcher = patch.dict(sys.modules, StubMCP.modules())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        StubSession.tools = [make_tool("create", {"type": "object"}), make_tool("list", None)]
+        StubSession.fail_initialize = False
+        StubSession.open_sessions = 0
+        StubSession.peak_sessions = 0
+
+    async def test_fetch(self):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            async with mcp_collect.MCPSchemaClient("server", ["--flag"]) as client:
+                first = await client.fetch()
+                second = await client.fetch()
+
+        self.assertEqual(first, second)
+        self.assertEqual(first["create"], {
+            "description": "create 描述",
+            "inputSchema": {"type": "object"},
+            "parameters": {}
+        })
+        self.assertEqual(first["list"], {"description": "list 描述", "inputSchema": None})
+        self.assertEqual(StubMCP.spawned, [("server", ("--flag",))])
+        self.assertIn("服务器: server --flag", out.getvalue())
+
+    async def test_close_after_failed_initialize(self):
+        StubSession.fail_initialize = True
+        client = mcp_collect.MCPSchemaClient("server")
+
+        with self.assertRaisesRegex(RuntimeError, "initialize failed"):
+            await client.connect()
+
+        self.assertIsNone(client.session)
+        self.assertIs(StubMCP.sessions[0].exit_args[0], RuntimeError)
+        self.assertEqual(StubMCP.stdio_exit_args, [RuntimeError])
+        await client.close()
+
+    async def test_aexit_passes_exception(self):
+        with self.assertRaises(KeyError):
+            async with mcp_collect.MCPSchemaClient("server"):
+                raise KeyError("boom")
+
+        self.assertIs(StubMCP.sessions[0].exit_args[0], KeyError)
+        self.assertEqual(StubMCP.stdio_exit_args, [KeyError])
+
+    async def test_batch_deduplicates(self):
+        servers = [("a", ["x"]), ("b", None), ("a", ["x"]), ("b", [])]
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            batch = await mcp_collect.get_server_schemas_batch(servers)
+
+        self.assertEqual(list(batch), [("a", ("x",)), ("b", ())])
+        self.assertEqual(sorted(StubMCP.spawned), [("a", ("x",)), ("b", ())])
+
+    async def test_batch_limits_concurrency(self):
+        servers = [(f"server{i}", []) for i in range(7)]
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            batch = await mcp_collect.get_server_schemas_batch(servers, max_concurrency=3)
+
+        self.assertEqual(len(batch), 7)
+        self.assertEqual(StubSession.peak_sessions, 3)
+        self.assertEqual(StubSession.open_sessions, 0)
+
+    async def test_batch_propagates_cancellation(self):
+        async def cancelled(server_command, args=None):
+            raise asyncio.CancelledError()
+
+        with patch.object(mcp_collect, "get_server_schemas", cancelled):
+            with self.assertRaises(asyncio.CancelledError):
+                await mcp_collect.get_server_schemas_batch([("a", [])])
+
+    async def test_missing_mcp_raises(self):
+        with patch.dict(sys.modules, {"mcp": None}):
+            with self.assertRaises(ImportError):
+                await mcp_collect.get_server_schemas("server")
+
+
+class TestSaveSchemasToFile(unittest.TestCase):
+
+    schemas = {"tool": {"description": "中文描述", "inputSchema": {"maximum": 2 ** 70}}}
+
+    def save(self, **kwargs):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "schemas.json")
+            with contextlib.redirect_stdout(io.StringIO()):
+                mcp_collect.save_schemas_to_file(self.schemas, filename, **kwargs)
+            with open(filename, encoding="utf-8") as f:
+                return f.read()
+
+    def test_default_is_compact_ascii(self):
+        content = self.save()
+        self.assertEqual(content, json.dumps(self.schemas, separators=(',', ':')))
+        self.assertNotIn("中文", content)
+
+    def test_pretty(self):
+        self.assertEqual(self.save(pretty=True), json.dumps(self.schemas, indent=2))
+
+    def test_utf8(self):
+        for orjson in (mcp_collect.orjson, None):
+            with patch.object(mcp_collect, "orjson", orjson):
+                content = self.save(ensure_ascii=False)
+            self.assertIn("中文描述", content)
+            self.assertEqual(json.loads(content), self.schemas)
+
+
+if __name__ == "__main__":
+    unittest.main()